@@ -1,13 +1,19 @@
 ## config/const.py
 
+import sys
+
 from config.settings import config
 
 JOB_VACANCY_CHANNEL = "job_seek"
 
+JOB_VACANCY_GROUP = "auto_emailer"  # consumer group when REDIS_TRANSPORT = "stream"
+
+ACCOUNT_CACHE_TTL = 60  # seconds
+
 CV_BASE_PATH = config.BASE_DIR / "data" / "cv"
 
 TEMPLATE_BASE_PATH = config.BASE_DIR / "data" / "template"
 
-FEMALE_KEYWORDS = {"female", "perempuan", "wanita"}
+FEMALE_KEYWORDS = frozenset(map(sys.intern, ("female", "perempuan", "wanita")))
 
-MALE_KEYWORDS = {"male", "men", "laki-laki", "pria"}
\ No newline at end of file
+MALE_KEYWORDS = frozenset(map(sys.intern, ("male", "men", "laki-laki", "pria")))
\ No newline at end of file
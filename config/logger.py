@@ -1,19 +1,36 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from config.settings import config
 
 def setup_logging():
     
     os.makedirs("log", exist_ok=True)
     
+    formatter = logging.Formatter(
+        fmt="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    
     handlers = [
         logging.FileHandler("log/bot.log"),
         logging.StreamHandler()
     ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # File/stream writes happen on the listener thread, not the event loop
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
 
     logging.basicConfig(
         level=getattr(logging, config.LOG_LEVEL),
-        format="%(asctime)s [%(levelname)s] %(message)s",  
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=handlers
-    )
\ No newline at end of file
+        handlers=[queue_handler]
+    )
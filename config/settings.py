@@ -6,12 +6,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class Settings:
     # Redis
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD")
+    REDIS_TRANSPORT: str = os.getenv("REDIS_TRANSPORT", "pubsub")  # "pubsub" or "stream"
 
     # Database
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
@@ -24,6 +25,7 @@ class Settings:
     SMTP_SERVER: Optional[str] = os.getenv("SMTP_SERVER")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
     DEV_EMAIL: Optional[str] = os.getenv("DEV_EMAIL")
+    EMAIL_CONCURRENCY: int = int(os.getenv("EMAIL_CONCURRENCY", "5"))
 
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "DEV")
@@ -9,33 +9,41 @@ from config.settings import config
 pool: asyncpg.Pool | None = None
 
 async def fetch(query: str, *args):
-    async with pool.acquire() as conn:
-        return await conn.fetch(query, *args)
+    return await pool.fetch(query, *args)
 
 async def fetchrow(query: str, *args):
-    async with pool.acquire() as conn:
-        return await conn.fetchrow(query, *args)
+    return await pool.fetchrow(query, *args)
     
 async def fetchval(query: str, *args):
-    async with pool.acquire() as conn:
-        return await conn.fetchval(query, *args)
+    return await pool.fetchval(query, *args)
 
 async def execute(query: str, *args):
-    async with pool.acquire() as conn:
-        return await conn.execute(query, *args)
+    return await pool.execute(query, *args)
 
-@asynccontextmanager
-async def db_transaction():
-    async with pool.acquire() as conn:
-        async with conn.transaction():
-            yield conn
+class _TransactionContext:
+    """Acquire a pooled connection and run the block inside a transaction."""
+
+    __slots__ = ("_acquire", "_transaction")
+
+    async def __aenter__(self):
+        self._acquire = pool.acquire()
+        conn = await self._acquire.__aenter__()
+        try:
+            self._transaction = conn.transaction()
+            await self._transaction.__aenter__()
+        except BaseException:
+            await self._acquire.__aexit__(None, None, None)
+            raise
+        return conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self._transaction.__aexit__(exc_type, exc, tb)
+        finally:
+            await self._acquire.__aexit__(exc_type, exc, tb)
+
+db_transaction = transaction = _TransactionContext
 
-@asynccontextmanager
-async def transaction():
-    async with pool.acquire() as conn:
-        async with conn.transaction():
-            yield conn
-            
 @asynccontextmanager
 async def db_connection():
     async with pool.acquire() as conn:
@@ -51,8 +59,11 @@ async def init_db_pool():
                 database=config.DB_NAME,
                 host=config.DB_HOST,
                 port=config.DB_PORT,
-                min_size=1,
+                min_size=5,
                 max_size=20,
+                max_inactive_connection_lifetime=300,
+                command_timeout=30,
+                statement_cache_size=1024,
                 ssl='require',
             )
             logging.info("[ DB ] -------------------- Connection pool created")
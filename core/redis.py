@@ -1,50 +1,89 @@
 ## core/redis.py
 
 import logging
-from redis.asyncio import Redis
+from redis.asyncio import Redis, ConnectionPool
 from config.settings import config
 
 log = logging.getLogger(__name__)
 
+connection_pool: ConnectionPool | None = None
 redis_client: Redis | None = None
 
+# Separate pool for the subscriber, so a PubSub connection or blocking
+# XREADGROUP never holds a connection needed by regular commands
+subscriber_pool: ConnectionPool | None = None
+subscriber_client: Redis | None = None
+
+def _create_pool(max_connections: int) -> ConnectionPool:
+    return ConnectionPool(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        password=config.REDIS_PASSWORD,
+        max_connections=max_connections,
+        decode_responses=False,  # Keep as bytes for binary data
+        socket_connect_timeout=5,
+        socket_timeout=5
+    )
+
 async def init_redis() -> Redis:
-    """Initialize Redis async connection"""
-    global redis_client
+    """Initialize Redis async connection pool"""
+    global connection_pool, redis_client
     try:
-        redis_client = Redis(
-            host=config.REDIS_HOST,
-            port=config.REDIS_PORT,
-            password=config.REDIS_PASSWORD,
-            ssl=False,
-            decode_responses=False,  # Keep as bytes for binary data
-            socket_connect_timeout=5,
-            socket_timeout=5
-        )
-        
+        connection_pool = _create_pool(max_connections=16)
+        redis_client = Redis(connection_pool=connection_pool)
+
         # Test connection
         await redis_client.ping()
         log.info("[ REDIS ] Connection established")
         return redis_client
-    
+
     except Exception as e:
         log.error(f"[ REDIS ] Failed to connect: {e}")
         raise
 
 
+async def init_subscriber_redis() -> Redis:
+    """Initialize the dedicated Redis client used only by the subscriber"""
+    global subscriber_pool, subscriber_client
+    try:
+        # Only one connection is ever in use: the PubSub connection, or for
+        # streams the read loop, which also sends the acks (as does stop()
+        # once the loop has exited)
+        subscriber_pool = _create_pool(max_connections=1)
+        subscriber_client = Redis(connection_pool=subscriber_pool)
+
+        await subscriber_client.ping()
+        log.info("[ REDIS ] Subscriber connection established")
+        return subscriber_client
+
+    except Exception as e:
+        log.error(f"[ REDIS ] Failed to connect subscriber: {e}")
+        raise
+
+
 async def close_redis():
     """Close Redis connection gracefully"""
-    global redis_client
-    if redis_client:
+    global connection_pool, redis_client, subscriber_pool, subscriber_client
+    for client, pool in (
+        (subscriber_client, subscriber_pool),
+        (redis_client, connection_pool),
+    ):
+        if not client:
+            continue
         try:
-            await redis_client.aclose()
+            await client.aclose()
+            if pool:
+                await pool.disconnect()
             log.info("[ REDIS ] Connection closed")
         except Exception as e:
             log.error(f"[ REDIS ] Error closing connection: {e}")
-        finally:
-            redis_client = None
+
+    redis_client = None
+    connection_pool = None
+    subscriber_client = None
+    subscriber_pool = None
 
 
 def get_redis() -> Redis | None:
     """Get current Redis client instance"""
-    return redis_client
\ No newline at end of file
+    return redis_client
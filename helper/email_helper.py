@@ -1,5 +1,6 @@
 ## helper/email_helper.py
 
+import functools
 import logging
 import re
 
@@ -9,6 +10,24 @@ from pathlib import Path
 
 log = logging.getLogger(__name__)
 
+_PLACEHOLDER_RE = re.compile(r'\{\{(\w+)\}\}')
+# Runs of "_" / "-" collapse to one char, runs of whitespace to one space
+_SEPARATOR_RUN_RE = re.compile(r'([_-])\1+|\s{2,}')
+# Leading/trailing separators, stripped after the runs are collapsed
+_EDGE_SEPARATORS_RE = re.compile(r'^[_\-\s]+|[_\-\s]+$')
+
+@functools.lru_cache(maxsize=256)
+def _split_placeholders(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Split template/subject into (literal, placeholder_key) pairs, parsed once per string."""
+    parts = []
+    last = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        parts.append((template[last:match.start()], match.group(1)))
+        last = match.end()
+    parts.append((template[last:], None))
+    return tuple(parts)
+
+
 class EmailValidationError(Exception):
     """Raised when email data validation fails."""
     pass
@@ -33,52 +52,50 @@ class EmailHelper:
         """
         original_subject = subject
         
-        # Find all {{placeholder}} patterns
-        pattern = r'\{\{(\w+)\}\}'
-        
-        def replace_placeholder(match):
-            key = match.group(1)
+        # Resolve {{placeholders}} from the cached split of this subject
+        parts = []
+        for literal, key in _split_placeholders(subject):
+            parts.append(literal)
+            if key is None:
+                continue
             value = data.get(key)
-            
             if value is None:
                 log.warning(
-                    f"[ EMAILER ] Placeholder '{{{{{key}}}}}' not found in data, removing it"
+                    "[ EMAILER ] Placeholder '{{%s}}' not found in data, removing it", key
                 )
-                return ""  # Remove placeholder entirely
-            
-            return str(value)
-        
-        cleaned_subject = re.sub(pattern, replace_placeholder, subject)
-        
-        # Clean up extra spaces, underscores, and dashes
-        cleaned_subject = re.sub(r'_{2,}', '_', cleaned_subject)  # Multiple underscores → single
-        cleaned_subject = re.sub(r'-{2,}', '-', cleaned_subject)  # Multiple dashes → single
-        cleaned_subject = re.sub(r'\s{2,}', ' ', cleaned_subject)  # Multiple spaces → single
-        cleaned_subject = re.sub(r'[_\-\s]+$', '', cleaned_subject)  # Trailing separators
-        cleaned_subject = re.sub(r'^[_\-\s]+', '', cleaned_subject)  # Leading separators
+            else:
+                parts.append(str(value))
         
-        cleaned_subject = cleaned_subject.strip()
+        # Clean up extra spaces, underscores, and dashes, then leading/trailing separators
+        cleaned_subject = _SEPARATOR_RUN_RE.sub(
+            lambda m: m.group(1) or ' ', ''.join(parts)
+        )
+        cleaned_subject = _EDGE_SEPARATORS_RE.sub('', cleaned_subject)
                 
         if not cleaned_subject:
             name = data.get("name", "Applicant")
             log.warning(
-                f"[ EMAILER ] All placeholders removed from '{original_subject}', "
-                f"using default subject"
+                "[ EMAILER ] All placeholders removed from '%s', using default subject",
+                original_subject
             )
             return f"Lamaran Pekerjaan - {name}"
         
         # Log changes if any
-        if cleaned_subject != original_subject:
-            log.info(f"[ EMAILER ] Subject cleaned: '{original_subject}' → '{cleaned_subject}'")
+        if cleaned_subject != original_subject and log.isEnabledFor(logging.INFO):
+            log.info(
+                "[ EMAILER ] Subject cleaned: '%s' → '%s'", original_subject, cleaned_subject
+            )
         
         return cleaned_subject
     
     @staticmethod
+    @functools.lru_cache(maxsize=512)
     def get_cv_path(username: str) -> Path:
         """Get CV path based on username."""
         return CV_BASE_PATH / f"CV_{username}.pdf"
     
     @staticmethod
+    @functools.lru_cache(maxsize=512)
     def get_template_path(username: str) -> Path:
         """Get template path based on username."""
         return TEMPLATE_BASE_PATH / f"{username}.html"
@@ -86,22 +103,29 @@ class EmailHelper:
     @staticmethod
     def render_template(template: str, data: dict) -> str:
         """Replace {{placeholder}} in template with dict values."""
-        body = template
-        for key, value in data.items():
-            placeholder = f"{{{{{key}}}}}"
-            body = body.replace(placeholder, str(value))
-        return body
+        chunks = []
+        for literal, key in _split_placeholders(template):
+            chunks.append(literal)
+            if key is None:
+                continue
+            if key in data:
+                chunks.append(str(data[key]))
+            else:
+                chunks.append(f"{{{{{key}}}}}")  # Unknown placeholders are left untouched
+        return "".join(chunks)
     
     @staticmethod
     def normalize_emails(emails: List[str]) -> Set[str]:
         """Normalize email addresses."""
-        normalized = set()
-        for email in emails:
-            if isinstance(email, str):
-                cleaned = email.strip().replace(" ", "")
-                if cleaned:
-                    normalized.add(cleaned)
-        return normalized
+        return {
+            cleaned
+            for cleaned in (
+                email.strip().replace(" ", "")
+                for email in emails
+                if type(email) is str  # payload comes straight from JSON, never a str subclass
+            )
+            if cleaned
+        }
     
     
     @staticmethod
@@ -5,13 +5,19 @@ import asyncio
 import signal
 from typing import Optional
 
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (not available on Windows)
+    uvloop = None
+
 from services.email_stats import EmailLogStats
 
 from core import redis, db
 from config.logger import setup_logging
-from config.const import JOB_VACANCY_CHANNEL
-from services.emailer import BatchEmailProcessor
-from services.redis_subscriber import RedisSubscriber
+from config.settings import config
+from config.const import JOB_VACANCY_CHANNEL, JOB_VACANCY_GROUP
+from services.emailer import BatchEmailProcessor, close_smtp_sessions
+from services.redis_subscriber import RedisSubscriber, RedisStreamSubscriber
 
 setup_logging()
 
@@ -50,15 +56,28 @@ class AutoEmailer:
     async def start(self):
         log.info("[ AUTO EMAILER ] Starting up...")
 
-        self.redis = await redis.init_redis()
-        await db.init_db_pool()
-
-        self.subscriber = RedisSubscriber(
-            redis_client=self.redis,
-            channel=JOB_VACANCY_CHANNEL,
-            message_handler=self._handle_payload,
-            shutdown_event=self.shutdown_event,
+        # Independent connections, so open them concurrently
+        self.redis, subscriber_redis, _ = await asyncio.gather(
+            redis.init_redis(),
+            redis.init_subscriber_redis(),
+            db.init_db_pool(),
         )
+
+        if config.REDIS_TRANSPORT == "stream":
+            self.subscriber = RedisStreamSubscriber(
+                redis_client=subscriber_redis,
+                channel=JOB_VACANCY_CHANNEL,
+                message_handlers=[self._handle_payload],
+                shutdown_event=self.shutdown_event,
+                group=JOB_VACANCY_GROUP,
+            )
+        else:
+            self.subscriber = RedisSubscriber(
+                redis_client=subscriber_redis,
+                channel=JOB_VACANCY_CHANNEL,
+                message_handlers=[self._handle_payload],
+                shutdown_event=self.shutdown_event,
+            )
         await self.subscriber.start()
         
         self.stats_task = asyncio.create_task(self._log_stats_periodically())
@@ -85,6 +104,8 @@ class AutoEmailer:
         if self.subscriber:
             await self.subscriber.stop()
 
+        await close_smtp_sessions()
+
         await redis.close_redis()
         await db.close_pool()
 
@@ -123,11 +144,9 @@ class AutoEmailer:
 
         results = await self.batch_processor.process_job_application(extracted_data)
 
-        success = sum(1 for v in results.values() if v)
-        failed = len(results) - success
+        failed_accounts = [k for k, v in results.items() if not v]
 
-        if failed:
-            failed_accounts = [k for k, v in results.items() if not v]
+        if failed_accounts:
             log.warning(f"[ PROCESSOR ] Failed accounts: {', '.join(failed_accounts)}")
     
 async def main():
@@ -152,4 +171,7 @@ async def main():
         log.info("[ AUTO EMAILER ] Exiting...")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
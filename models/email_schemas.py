@@ -1,8 +1,36 @@
 ## models/email_schemas.py
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+import logging
+import re
+
+from pydantic import BaseModel, EmailStr, Field, PrivateAttr, field_validator
 from pydantic import ConfigDict
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional, fall back to a regex alternation
+    ahocorasick = None
+
+log = logging.getLogger(__name__)
+
+
+def _build_keyword_matcher(keywords: Tuple[str, ...]) -> Optional[Callable[[str], bool]]:
+    """Build a single-pass "contains any keyword" check."""
+    if not keywords:
+        return None
+
+    # Automaton can't hold empty words; an empty keyword matches everything anyway
+    if ahocorasick is not None and all(keywords):
+        automaton = ahocorasick.Automaton()
+        for index, keyword in enumerate(keywords):
+            automaton.add_word(keyword, index)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+
+    pattern = re.compile("|".join(map(re.escape, keywords)))
+    return lambda text: pattern.search(text) is not None
+
 
 class EmailAccountSchema(BaseModel):
     """Email account credentials."""
@@ -47,9 +75,40 @@ class EmailAccountData(BaseModel):
     #   "regex_patterns": [".*medis.*"]
     # }
     
+    # Prepared once per load, used by AccountDataService.is_position_blocked
+    _blocked_keywords: Tuple[str, ...] = PrivateAttr(default=())
+    _blocked_patterns: Tuple[re.Pattern, ...] = PrivateAttr(default=())
+    _keyword_matcher: Optional[Callable[[str], bool]] = PrivateAttr(default=None)
 
     model_config = ConfigDict(from_attributes=True)
 
+    def model_post_init(self, __context: Any) -> None:
+        blocked = self.blocked_job_position
+        self._blocked_keywords = tuple(k.lower() for k in blocked.get("keywords", []))
+        self._keyword_matcher = _build_keyword_matcher(self._blocked_keywords)
+
+        patterns = []
+        for pattern in blocked.get("regex_patterns", []):
+            try:
+                patterns.append(re.compile(pattern))
+            except re.error:
+                log.warning(f"[ ACCOUNT DATA ] Invalid regex: {pattern}")
+        self._blocked_patterns = tuple(patterns)
+
+    @property
+    def blocked_keywords(self) -> Tuple[str, ...]:
+        """Lowercased blocked keywords."""
+        return self._blocked_keywords
+
+    def contains_blocked_keyword(self, text: str) -> bool:
+        """Check lowercased text against all blocked keywords in one pass."""
+        return self._keyword_matcher is not None and self._keyword_matcher(text)
+
+    @property
+    def blocked_patterns(self) -> Tuple[re.Pattern, ...]:
+        """Precompiled blocked regex patterns (invalid ones skipped)."""
+        return self._blocked_patterns
+
 
 class CompleteAccountInfo(BaseModel):
     """Complete account information for sending email."""
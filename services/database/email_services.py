@@ -1,13 +1,16 @@
 ## services/database/email_services.py
 
+import asyncio
 import logging
-import re
-from typing import Optional, List, Dict, Set, Tuple
+import time
+from typing import Optional, List, Dict, Set, Tuple, Iterable
 from datetime import datetime, timezone
 from pathlib import Path
-import json
+
+import orjson
 
 from core import db
+from config.const import ACCOUNT_CACHE_TTL
 from models.email_schemas import (
     EmailAccountSchema, 
     EmailAccountProfile, 
@@ -17,6 +20,11 @@ from models.email_schemas import (
 
 log = logging.getLogger(__name__)
 
+# In-process cache of all active complete accounts, refreshed every ACCOUNT_CACHE_TTL
+_accounts_cache: Optional[List[CompleteAccountInfo]] = None
+_accounts_cache_expires_at: float = 0.0
+_accounts_cache_lock = asyncio.Lock()
+
 
 class EmailAccountService:
     """Service untuk mengelola email accounts."""
@@ -70,6 +78,21 @@ class ProfileService:
         except Exception as e:
             log.error(f"[ PROFILE SERVICE ] Error fetching profile: {e}")
             raise
+    
+    @staticmethod
+    async def get_profiles(account_ids: List[int]) -> Dict[int, EmailAccountProfile]:
+        """Get profiles for many accounts in one query, keyed by account_id."""
+        try:
+            query = """
+                SELECT account_id, name, username, gender, phone
+                FROM email.account_profiles
+                WHERE account_id = ANY($1::int[])
+            """
+            results = await db.fetch(query, account_ids)
+            return {row["account_id"]: EmailAccountProfile(**dict(row)) for row in results}
+        except Exception as e:
+            log.error(f"[ PROFILE SERVICE ] Error fetching profiles: {e}")
+            raise
 
 
 class AccountDataService:
@@ -88,48 +111,55 @@ class AccountDataService:
             if not result:
                 return None
 
-            data = dict(result)
-
-            blocked = data.get("blocked_job_position")
-            if isinstance(blocked, str):
-                data["blocked_job_position"] = json.loads(blocked)
-
-            return EmailAccountData(**data)
+            return AccountDataService._to_account_data(result)
 
         except Exception as e:
             log.error(f"[ ACCOUNT DATA SERVICE ] Error fetching data: {e}")
             raise
     
+    @staticmethod
+    async def get_account_data_batch(account_ids: List[int]) -> Dict[int, EmailAccountData]:
+        """Get account data for many accounts in one query, keyed by account_id."""
+        try:
+            query = """
+                SELECT account_id, blocked_job_position
+                FROM email.account_data
+                WHERE account_id = ANY($1::int[])
+            """
+            results = await db.fetch(query, account_ids)
+            return {
+                row["account_id"]: AccountDataService._to_account_data(row)
+                for row in results
+            }
+        except Exception as e:
+            log.error(f"[ ACCOUNT DATA SERVICE ] Error fetching data batch: {e}")
+            raise
+    
+    @staticmethod
+    def _to_account_data(row) -> EmailAccountData:
+        """Build EmailAccountData from a row, decoding jsonb returned as text."""
+        data = dict(row)
+
+        blocked = data.get("blocked_job_position")
+        if isinstance(blocked, str):
+            data["blocked_job_position"] = orjson.loads(blocked)
+
+        return EmailAccountData(**data)
+    
     @staticmethod
     def is_position_blocked(
         account_data: EmailAccountData, 
         position: str
     ) -> bool:
         """Check if position is blocked based on keywords or regex."""
-        try:
-            position_lower = " ".join(position.lower().split())
-            blocked = account_data.blocked_job_position
-            
-            # Check keywords
-            keywords = blocked.get("keywords", [])
-            for keyword in keywords:
-                if keyword.lower() in position_lower:
-                    return True
-            
-            # Check regex patterns
-            patterns = blocked.get("regex_patterns", [])
-            for pattern in patterns:
-                try:
-                    if re.search(pattern, position_lower):
-                        return True
-                except re.error:
-                    log.warning(f"[ ACCOUNT DATA SERVICE ] Invalid regex: {pattern}")
-                    continue
-            
-            return False
-        except Exception as e:
-            log.error(f"[ ACCOUNT DATA SERVICE ] Error checking blocked position: {e}")
-            return False  # Fail open
+        position_lower = " ".join(position.lower().split())
+        
+        # Keywords are lowercased and invalid patterns already dropped when
+        # account data is loaded, so nothing here can raise
+        if account_data.contains_blocked_keyword(position_lower):
+            return True
+        
+        return any(pattern.search(position_lower) for pattern in account_data.blocked_patterns)
 
 
 class CompleteAccountService:
@@ -139,16 +169,19 @@ class CompleteAccountService:
     async def get_complete_account_info(account_id: int) -> Optional[CompleteAccountInfo]:
         """Get complete account information."""
         try:
-            account = await EmailAccountService.get_account_by_id(account_id)
+            # Independent lookups, run them concurrently on separate pool connections
+            account, profile, data = await asyncio.gather(
+                EmailAccountService.get_account_by_id(account_id),
+                ProfileService.get_profile(account_id),
+                AccountDataService.get_account_data(account_id),
+            )
             if not account:
                 return None
             
-            profile = await ProfileService.get_profile(account_id)
             if not profile:
                 log.error(f"[ COMPLETE ACCOUNT SERVICE ] No profile for account {account_id}")
                 return None
             
-            data = await AccountDataService.get_account_data(account_id)
             if not data:
                 log.error(f"[ COMPLETE ACCOUNT SERVICE ] No data for account {account_id}")
                 return None
@@ -167,18 +200,60 @@ class CompleteAccountService:
         """Get all active accounts with complete info."""
         try:
             accounts = await EmailAccountService.get_active_accounts()
-            complete_accounts = []
+            if not accounts:
+                return []
             
+            # One query per table for all accounts, joined in Python
+            account_ids = [account.id for account in accounts]
+            profiles, datas = await asyncio.gather(
+                ProfileService.get_profiles(account_ids),
+                AccountDataService.get_account_data_batch(account_ids),
+            )
+            
+            complete_accounts = []
             for account in accounts:
-                complete = await CompleteAccountService.get_complete_account_info(account.id)
-                if complete:
-                    complete_accounts.append(complete)
+                profile = profiles.get(account.id)
+                if not profile:
+                    log.error(f"[ COMPLETE ACCOUNT SERVICE ] No profile for account {account.id}")
+                    continue
+                
+                data = datas.get(account.id)
+                if not data:
+                    log.error(f"[ COMPLETE ACCOUNT SERVICE ] No data for account {account.id}")
+                    continue
+                
+                complete_accounts.append(
+                    CompleteAccountInfo(account=account, profile=profile, data=data)
+                )
             
             return complete_accounts
         except Exception as e:
             log.error(f"[ COMPLETE ACCOUNT SERVICE ] Error getting all accounts: {e}")
             raise
 
+    
+    @staticmethod
+    async def get_cached_active_complete_accounts() -> List[CompleteAccountInfo]:
+        """Get all active accounts with complete info, cached for ACCOUNT_CACHE_TTL seconds."""
+        global _accounts_cache, _accounts_cache_expires_at
+        
+        if _accounts_cache is not None and time.monotonic() < _accounts_cache_expires_at:
+            return _accounts_cache
+        
+        async with _accounts_cache_lock:
+            # Another task may have refreshed while we waited for the lock
+            if _accounts_cache is None or time.monotonic() >= _accounts_cache_expires_at:
+                _accounts_cache = await CompleteAccountService.get_all_active_complete_accounts()
+                _accounts_cache_expires_at = time.monotonic() + ACCOUNT_CACHE_TTL
+            return _accounts_cache
+    
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop cached accounts so the next lookup reloads them from the database."""
+        global _accounts_cache, _accounts_cache_expires_at
+        _accounts_cache = None
+        _accounts_cache_expires_at = 0.0
+
 
 class SentLogService:
     """Service untuk sent logs."""
@@ -200,30 +275,47 @@ class SentLogService:
             log.error(f"[ SENT LOG SERVICE ] Error checking sent: {e}")
             raise
     
+    @staticmethod
+    async def check_already_sent_batch(
+        target_emails: Iterable[str],
+        sender_email: str
+    ) -> Set[str]:
+        """Return the subset of target emails already sent from sender, in one query."""
+        try:
+            query = """
+                SELECT target_email
+                FROM email.sent_logs
+                WHERE sender_email = $1 AND target_email = ANY($2::text[])
+            """
+            results = await db.fetch(query, sender_email, list(target_emails))
+            return {row["target_email"] for row in results}
+        except Exception as e:
+            log.error(f"[ SENT LOG SERVICE ] Error checking sent batch: {e}")
+            raise
+    
     @staticmethod
     async def record_sent_batch(
         emails: List[Tuple[str, str]],  # [(target, sender), ...]
     ) -> int:
         """Record multiple sent emails."""
         try:
+            if not emails:
+                return 0
+            
             timestamp = datetime.now(timezone.utc)
+            targets, senders = (list(column) for column in zip(*emails))
             
+            # Single statement (atomic on its own), one round-trip for the whole batch
             query = """
                 INSERT INTO email.sent_logs 
                 (target_email, sender_email, sent_at)
-                VALUES ($1, $2, $3)
+                SELECT target_email, sender_email, $3
+                FROM unnest($1::text[], $2::text[]) AS t(target_email, sender_email)
                 ON CONFLICT (target_email, sender_email) DO NOTHING
                 RETURNING id
             """
             
-            count = 0
-            async with db.transaction():
-                for target_email, sender_email in emails:
-                    result = await db.fetchval(
-                        query, target_email, sender_email, timestamp
-                    )
-                    if result:
-                        count += 1
+            count = len(await db.fetch(query, targets, senders, timestamp))
             
             log.info(f"[ SENT LOG SERVICE ] Recorded {count}/{len(emails)} emails")
             return count
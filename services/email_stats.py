@@ -3,7 +3,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class EmailLogStats:
     processed: int = 0
     emails_sent: int = 0
@@ -14,24 +14,30 @@ class EmailLogStats:
     last_reset: datetime = field(default_factory=datetime.now)
     
     def reset(self):
-        self.__init__()
+        self.processed = 0
+        self.emails_sent = 0
+        self.failed = 0
+        self.unmatch_gender = 0
+        self.unrelevan_position = 0
+        self.duplicate = 0
+        self.last_reset = datetime.now()
     
     def get_summary(self) -> str:
         uptime = datetime.now() - self.last_reset
-        hours = uptime.seconds // 3600
-        minutes = (uptime.seconds // 60) % 60
+        hours, remainder = divmod(uptime.seconds, 3600)
+        minutes = remainder // 60
+        padding = " " * (13 - len(str(hours)) - len(str(minutes)))
         
-        return (
-            "\n"
-            "╔════════════════════════════════════════════════╗\n"
-            f"║         EMAIL STATS - Last {hours}h {minutes}m{' ' * (13 - len(str(hours)) - len(str(minutes)))}║\n"
-            "╠════════════════════════════════════════════════╣\n"
-            f"║ Jobs Processed     : {self.processed:>5}                 ║\n"
-            f"║ Emails Sent        : {self.emails_sent:>5} ✅              ║\n"
-            f"║ Failed             : {self.failed:>5} ❌              ║\n"
-            "╠════════════════════════════════════════════════╣\n"
-            f"║ Skipped (Gender)   : {self.unmatch_gender:>5}                 ║\n"
-            f"║ Skipped (Blocked)  : {self.unrelevan_position:>5}                 ║\n"
-            f"║ Skipped (Duplicate): {self.duplicate:>5}                 ║\n"
-            "╚════════════════════════════════════════════════╝\n"
-        )
\ No newline at end of file
+        return f"""
+╔════════════════════════════════════════════════╗
+║         EMAIL STATS - Last {hours}h {minutes}m{padding}║
+╠════════════════════════════════════════════════╣
+║ Jobs Processed     : {self.processed:>5}                 ║
+║ Emails Sent        : {self.emails_sent:>5} ✅              ║
+║ Failed             : {self.failed:>5} ❌              ║
+╠════════════════════════════════════════════════╣
+║ Skipped (Gender)   : {self.unmatch_gender:>5}                 ║
+║ Skipped (Blocked)  : {self.unrelevan_position:>5}                 ║
+║ Skipped (Duplicate): {self.duplicate:>5}                 ║
+╚════════════════════════════════════════════════╝
+"""
\ No newline at end of file
@@ -1,19 +1,25 @@
 ## services/emailer.py
 
 from aiosmtplib import SMTP
-from aiosmtplib.errors import SMTPException, SMTPAuthenticationError
+from aiosmtplib.errors import SMTPException, SMTPAuthenticationError, SMTPServerDisconnected
 
+import asyncio
+import base64
 import logging
+import sys
+from collections import OrderedDict
 from typing import Optional, Set, List
 from pathlib import Path
-from helper.email_helper import EmailHelper
+from helper.email_helper import EmailHelper, EmailValidationError
 
+from config.settings import config
 from config.const import FEMALE_KEYWORDS, MALE_KEYWORDS
 from .email_stats import EmailLogStats
 
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
+from email import encoders
 
 from .database.email_services import (
     CompleteAccountService,
@@ -25,29 +31,56 @@ from models.email_schemas import CompleteAccountInfo
 
 log = logging.getLogger(__name__)
 
-class EmailValidationError(Exception):
-    """Raised when email data validation fails."""
-    pass
+RENDERED_CACHE_SIZE = 256
 
+# Logged-in SMTP session per account email, shared by every EmailSender
+_smtp_sessions: dict[str, SMTP] = {}
+
+# Serializes duplicate check -> send -> record per sender email; also the
+# only guard on that sender's shared SMTP session
+_sender_locks: dict[str, asyncio.Lock] = {}
+
+def _lock_for(locks: dict[str, asyncio.Lock], key: str) -> asyncio.Lock:
+    lock = locks.get(key)
+    if lock is None:
+        lock = locks[key] = asyncio.Lock()
+    return lock
+
+async def close_smtp_sessions() -> None:
+    """Quit every pooled SMTP session (process-wide, call on shutdown)."""
+    sessions = list(_smtp_sessions.values())
+    _smtp_sessions.clear()
+
+    for smtp in sessions:
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
 
 class EmailSender:
     """Simplified email sender with gender-based filtering."""
     
     def __init__(self, stats: EmailLogStats):
         
-        self._template_cache: dict[str, str] = {}
+        self._template_cache: dict[Path, str] = {}
+        self._cv_cache: dict[Path, tuple[float, str]] = {}
+        self._rendered_cache: OrderedDict[tuple, str] = OrderedDict()
+        self._encoded_body_cache: OrderedDict[str, str] = OrderedDict()
         self.stats = stats  
 
+
     
     async def send_email_for_account(self, 
                                      account_id: int,
-                                     email_data: dict) -> bool:
+                                     email_data: dict,
+                                     account_info: Optional[CompleteAccountInfo] = None) -> bool:
         """
         Send email using specific account.
         
         Args:
             account_id: ID of sender account
             email_data: Job application data
+            account_info: Preloaded account info (skips the database lookup)
             
         email_data structure:
             {
@@ -63,7 +96,8 @@ class EmailSender:
         """
         try:
             # 1. Load complete account info
-            account_info = await CompleteAccountService.get_complete_account_info(account_id)
+            if account_info is None:
+                account_info = await CompleteAccountService.get_complete_account_info(account_id)
             if not account_info:
                 log.error(f"[ EMAILER ] Account not found: {account_id}")
                 return False
@@ -80,39 +114,43 @@ class EmailSender:
                 )
                 return False
 
-            # 3. Check business rules
-            if not await self._should_send_email(
-                account_info, target_emails, position, job_gender
-            ):
-                return False
+            # 3-7 run under a per-sender lock: concurrent subscriber workers
+            # handling the same vacancy must not both pass the duplicate
+            # check before either has recorded its send
+            async with _lock_for(_sender_locks, account_info.account.email):
+                # 3. Check business rules
+                if not await self._should_send_email(
+                    account_info, target_emails, position, job_gender
+                ):
+                    return False
             
-            # 4. Get paths based on username
-            username = account_info.profile.username
-            cv_path = EmailHelper.get_cv_path(username)
-            template_path = EmailHelper.get_template_path(username)
+                # 4. Get paths based on username
+                username = account_info.profile.username
+                cv_path = EmailHelper.get_cv_path(username)
+                template_path = EmailHelper.get_template_path(username)
             
-            # 5. Prepare email components
-            subject = self._prepare_subject(email_data, position, account_info)
-            body_html = await self._load_and_render_template(
-                template_path,
-                {
-                    "position": position,
-                    "name": account_info.profile.name,
-                    "phone": account_info.profile.phone
-                }
-            )
+                # 5. Prepare email components
+                subject = self._prepare_subject(email_data, position, account_info)
+                body_html = await self._load_and_render_template(
+                    template_path,
+                    {
+                        "position": position,
+                        "name": account_info.profile.name,
+                        "phone": account_info.profile.phone
+                    }
+                )
             
-            # 6. Build and send message
-            msg = self._build_message(
-                account_info, list(target_emails), subject, 
-                body_html, cv_path
-            )
-            await self._send_smtp(account_info.account, msg)
+                # 6. Build and send message
+                msg = self._build_message(
+                    account_info, list(target_emails), subject, 
+                    body_html, cv_path
+                )
+                await self._send_smtp(account_info.account, msg)
             
-            # 7. Record sent emails
-            await SentLogService.record_sent_batch(
-                [(target, account_info.account.email) for target in target_emails]
-            )
+                # 7. Record sent emails
+                await SentLogService.record_sent_batch(
+                    [(target, account_info.account.email) for target in target_emails]
+                )
             
             self.stats.emails_sent += len(target_emails)
             
@@ -137,17 +175,14 @@ class EmailSender:
         
     def _is_gender_compatible(self, user_gender: str, job_gender: Optional[str]) -> bool:
         """ 
-        Check gender required before send email
+        Check gender required before send email (both values already lowercased)
         """
         if not job_gender:
             return True
         
-        job_gender_lower = job_gender.lower()
-        user_gender_lower = user_gender.lower()
-        
-        if user_gender_lower == "male" and job_gender_lower in FEMALE_KEYWORDS:
+        if user_gender == "male" and job_gender in FEMALE_KEYWORDS:
             return False
-        if user_gender_lower == "female" and job_gender_lower in MALE_KEYWORDS:
+        if user_gender == "female" and job_gender in MALE_KEYWORDS:
             return False
         
         return True
@@ -166,11 +201,13 @@ class EmailSender:
         3. Duplicate checking
         """        
         
-        user_gender = account_info.profile.gender.lower()
+        # Profile gender is lowercased by EmailAccountProfile's validator at load time
+        user_gender = account_info.profile.gender
         
         if job_gender:
+            job_gender = sys.intern(job_gender.lower())
             if not self._is_gender_compatible(user_gender, job_gender):
-                gender_label = "female-only" if job_gender.lower() in FEMALE_KEYWORDS else "male-only"
+                gender_label = "female-only" if job_gender in FEMALE_KEYWORDS else "male-only"
                 log.warning(
                     f"[ EMAILER ] Skipped: {gender_label} job for {user_gender} user "
                     f"({account_info.profile.name}) - {position}"
@@ -190,14 +227,16 @@ class EmailSender:
         # 3. Check duplicates
         try:
             sender_email = account_info.account.email
-            for target_email in target_emails:
-                if await SentLogService.check_already_sent(target_email, sender_email):
-                    log.warning(
-                        f"[ EMAILER ] Skipped: Already sent to {target_email} "
-                        f"from {sender_email}"
-                    )
-                    self.stats.duplicate += 1
-                    return False
+            already_sent = await SentLogService.check_already_sent_batch(
+                target_emails, sender_email
+            )
+            if already_sent:
+                log.warning(
+                    f"[ EMAILER ] Skipped: Already sent to {', '.join(sorted(already_sent))} "
+                    f"from {sender_email}"
+                )
+                self.stats.duplicate += len(already_sent)
+                return False
             return True
         except Exception as e:
             log.error(f"[ EMAILER ] DB check failed: {e}")
@@ -209,18 +248,26 @@ class EmailSender:
         template_data: dict
     ) -> str:
         """Load and render HTML template with multiple placeholders."""
-        template_path_str = str(template_path)
+        render_key = (template_path, tuple(sorted(template_data.items())))
+        rendered = self._rendered_cache.get(render_key)
+        if rendered is not None:
+            self._rendered_cache.move_to_end(render_key)
+            return rendered
         
-        # Check cache
-        if template_path_str not in self._template_cache:
+        # Check cache (paths come memoized from EmailHelper, so key on them directly)
+        template = self._template_cache.get(template_path)
+        if template is None:
             if not template_path.exists():
                 raise FileNotFoundError(f"Template not found: {template_path}")
             
             with open(template_path, "r", encoding="utf-8") as f:
-                self._template_cache[template_path_str] = f.read()
+                template = self._template_cache[template_path] = f.read()
         
-        template = self._template_cache[template_path_str]
-        return EmailHelper.render_template(template, template_data)
+        rendered = EmailHelper.render_template(template, template_data)
+        self._rendered_cache[render_key] = rendered
+        if len(self._rendered_cache) > RENDERED_CACHE_SIZE:
+            self._rendered_cache.popitem(last=False)
+        return rendered
         
     def _prepare_subject(self, 
                         email_data: dict, 
@@ -253,6 +300,36 @@ class EmailSender:
         
         return EmailHelper.clean_subject(raw_subject, subject_data)
     
+    def _load_cv_payload(self, cv_path: Path) -> str:
+        """Return the base64-encoded CV, re-read only when the file changes."""
+        try:
+            mtime = cv_path.stat().st_mtime
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CV not found: {cv_path}") from None
+        
+        cached = self._cv_cache.get(cv_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        with open(cv_path, "rb") as f:
+            payload = base64.encodebytes(f.read()).decode("ascii")
+        
+        self._cv_cache[cv_path] = (mtime, payload)
+        return payload
+    
+    def _encode_body(self, body_html: str) -> str:
+        """Return the base64 UTF-8 payload for a rendered body, encoding it once."""
+        encoded = self._encoded_body_cache.get(body_html)
+        if encoded is not None:
+            self._encoded_body_cache.move_to_end(body_html)
+            return encoded
+        
+        encoded = base64.encodebytes(body_html.encode("utf-8")).decode("ascii")
+        self._encoded_body_cache[body_html] = encoded
+        if len(self._encoded_body_cache) > RENDERED_CACHE_SIZE:
+            self._encoded_body_cache.popitem(last=False)
+        return encoded
+    
     def _build_message(self,
                        account_info: CompleteAccountInfo,
                        target_emails: List[str],
@@ -269,17 +346,15 @@ class EmailSender:
         msg["To"] = ", ".join(target_emails)
         msg["Subject"] = subject
         
-        # Body (HTML only for simplicity)
-        msg.attach(MIMEText(body_html, 'html', 'utf-8'))
+        # Body (HTML only for simplicity), base64 payload reused from cache
+        body_part = MIMEText('', 'html', 'utf-8')
+        body_part.set_payload(self._encode_body(body_html))
+        msg.attach(body_part)
         
-        # CV attachment
-        if not cv_path.exists():
-            raise FileNotFoundError(f"CV not found: {cv_path}")
-        
-        with open(cv_path, "rb") as f:
-            file_data = f.read()
-        
-        pdf_part = MIMEApplication(file_data, _subtype="pdf")
+        # CV attachment (payload already base64-encoded, so skip the encoder)
+        pdf_part = MIMEApplication(b"", _subtype="pdf", _encoder=encoders.encode_noop)
+        pdf_part.set_payload(self._load_cv_payload(cv_path))
+        pdf_part["Content-Transfer-Encoding"] = "base64"
         pdf_part.add_header(
             'Content-Disposition',
             'attachment',
@@ -289,12 +364,12 @@ class EmailSender:
         
         return msg
     
-    async def _send_smtp(
-        self, 
-        account: EmailAccountSchema, 
-        msg: MIMEMultipart
-    ) -> None:
-        """Send email via Gmail SMTP."""
+    async def _get_smtp(self, account: EmailAccountSchema) -> SMTP:
+        """Return a connected, logged-in SMTP session for the account."""
+        smtp = _smtp_sessions.get(account.email)
+        if smtp is not None and smtp.is_connected:
+            return smtp
+        
         smtp = SMTP(
             hostname="smtp.gmail.com",
             port=587,
@@ -303,9 +378,36 @@ class EmailSender:
         )
         
         await smtp.connect()
-        await smtp.login(account.email, account.app_password)
-        await smtp.send_message(msg)
-        await smtp.quit()
+        try:
+            await smtp.login(account.email, account.app_password)
+        except Exception:
+            smtp.close()
+            raise
+        
+        _smtp_sessions[account.email] = smtp
+        return smtp
+    
+    async def _send_smtp(
+        self, 
+        account: EmailAccountSchema, 
+        msg: MIMEMultipart
+    ) -> None:
+        """
+        Send email via Gmail SMTP, reusing the account's session.
+
+        Callers hold the account's sender lock (see send_email_for_account),
+        which also keeps the shared session to one send at a time.
+        """
+        smtp = await self._get_smtp(account)
+        try:
+            await smtp.send_message(msg)
+        except SMTPServerDisconnected:
+            # Idle session dropped by the server, reconnect once
+            log.info(f"[ EMAILER ] SMTP session for {account.email} dropped, reconnecting")
+            _smtp_sessions.pop(account.email, None)
+            smtp.close()
+            smtp = await self._get_smtp(account)
+            await smtp.send_message(msg)
 
 
 class BatchEmailProcessor:
@@ -314,6 +416,27 @@ class BatchEmailProcessor:
     def __init__(self, stats: EmailLogStats):
         self.sender = EmailSender(stats)
         self.stats = stats
+        # Caps concurrent SMTP sessions across accounts
+        self._semaphore = asyncio.Semaphore(config.EMAIL_CONCURRENCY)
+    
+    async def _send_for_account(self,
+                                account_info: CompleteAccountInfo,
+                                email_data: dict) -> bool:
+        account_email = account_info.account.email
+        
+        async with self._semaphore:
+            try:
+                return await self.sender.send_email_for_account(
+                    account_info.account.id,
+                    email_data,
+                    account_info
+                )
+            except Exception as e:
+                log.error(
+                    f"[ BATCH PROCESSOR ] Failed for {account_email}: {e}",
+                    exc_info=True
+                )
+                return False
     
     async def process_job_application(self, email_data: dict) -> dict[str, bool]:
         """
@@ -326,25 +449,17 @@ class BatchEmailProcessor:
         results = {}
         
         try:
-            complete_accounts = await CompleteAccountService.get_all_active_complete_accounts()
+            complete_accounts = await CompleteAccountService.get_cached_active_complete_accounts()
             
             log.info(f"[ BATCH PROCESSOR ] Processing for {len(complete_accounts)} accounts")
             
-            for account_info in complete_accounts:
-                account_email = account_info.account.email
-                
-                try:
-                    success = await self.sender.send_email_for_account(
-                        account_info.account.id,
-                        email_data
-                    )
-                    results[account_email] = success
-                except Exception as e:
-                    log.error(
-                        f"[ BATCH PROCESSOR ] Failed for {account_email}: {e}",
-                        exc_info=True
-                    )
-                    results[account_email] = False
+            statuses = await asyncio.gather(*(
+                self._send_for_account(account_info, email_data)
+                for account_info in complete_accounts
+            ))
+            
+            for account_info, success in zip(complete_accounts, statuses):
+                results[account_info.account.email] = success
             
             return results
             
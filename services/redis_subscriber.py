@@ -1,14 +1,21 @@
 # services/redis_subscriber.py
 
 import asyncio
-import json
 import logging
+import random
+import socket
+
+import orjson
+from redis.exceptions import ResponseError
 
 from typing import (
     Optional,
+    Dict,
+    List,
     Callable,
     Awaitable,
     TypedDict,
+    NotRequired,
     Literal,
     Union,
     cast,
@@ -17,42 +24,229 @@ from typing import (
 
 log = logging.getLogger(__name__)
 
+# Max PubSub messages pulled from the socket per wakeup
+DRAIN_BATCH_SIZE = 100
+
+# Retry delay after a read error, doubled per consecutive failure
+INITIAL_BACKOFF = 0.25
+MAX_BACKOFF = 16.0
+
 
 class RedisMessage(TypedDict):
     type: Literal["message"]
-    channel: Union[str, bytes]
-    data: Union[str, bytes]
+    channel: Union[str, bytes]  # bytes from PubSub, the stream name for streams
+    data: bytes
+    id: NotRequired[bytes]  # stream entry id, only set by RedisStreamSubscriber
+
+
+class _Backoff:
+    """Capped exponential backoff with jitter for the read loops."""
+
+    __slots__ = ("delay",)
+
+    def __init__(self):
+        self.delay = INITIAL_BACKOFF
+
+    def reset(self):
+        self.delay = INITIAL_BACKOFF
+
+    async def sleep(self, error: Exception):
+        """Sleep before the next read, doubling the delay for the one after."""
+        delay = self.delay + random.uniform(0, self.delay / 4)
+        self.delay = min(self.delay * 2, MAX_BACKOFF)
+
+        log.error("[ SUBSCRIBER ] Read failed, retrying in %.2fs: %s", delay, error)
+        await asyncio.sleep(delay)
+
+
+class PubSubHub:
+    """
+    One PubSub connection and read loop shared by every subscriber of a client.
+
+    Each channel is subscribed on Redis once, however many RedisSubscribers
+    listen to it, and incoming messages are routed by channel to the queues
+    of the subscribers registered for it.
+    """
+
+    def __init__(self, redis_client: Any):
+        self.redis = redis_client
+        self.pubsub: Optional[Any] = None
+        self.task: Optional[asyncio.Task] = None
+
+        # Lists are replaced, never mutated, so the loop can iterate safely
+        self._routes: Dict[bytes, List[asyncio.Queue]] = {}
+        self._backoff = _Backoff()
+
+    async def add(self, channel: str, queue: asyncio.Queue):
+        key = channel.encode()
+        queues = self._routes.get(key)
+
+        if queues is None:
+            if self.pubsub is None:
+                self.pubsub = self.redis.pubsub()
+            await self.pubsub.subscribe(key)
+            queues = []
+
+        self._routes[key] = [*queues, queue]
+
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop(), name="redis_pubsub_hub")
+
+    async def remove(self, channel: str, queue: asyncio.Queue):
+        key = channel.encode()
+        queues = self._routes.get(key)
+        if not queues or queue not in queues:
+            return
+
+        remaining = [q for q in queues if q is not queue]
+        if remaining:
+            self._routes[key] = remaining
+            return
+
+        del self._routes[key]
+
+        if self._routes:
+            await self.pubsub.unsubscribe(key)
+            return
+
+        # Last channel gone: stop the read loop before dropping the
+        # subscription, then release the connection
+        _hubs.pop(self.redis, None)
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+        await self.pubsub.unsubscribe(key)
+        await self.pubsub.close()
+        self.pubsub = None
+        log.info("[ SUBSCRIBER ] Unsubscribed and closed")
+
+    async def _loop(self):
+        log.info("[ SUBSCRIBER ] Listening for messages...")
+        assert self.pubsub is not None
+
+        # Bound once, looked up as fast locals on every message
+        parse_response = self.pubsub.parse_response
+        handle_message = self.pubsub.handle_message
+        routes = self._routes
+        reset_backoff = self._backoff.reset
+
+        try:
+            while True:
+                try:
+                    # block=True waits on the socket until a reply arrives.
+                    # Do not poll with block=False/timeout=0 here: that returns
+                    # immediately and turns this loop into a busy spin at 100%
+                    # CPU on a quiet channel.
+                    response = await parse_response(block=True)
+                    reset_backoff()
+
+                    # Drain whatever is already buffered on the connection before
+                    # blocking again. timeout=0 is safe here: the drain stops at the
+                    # first empty read and is capped so a burst cannot hog the loop.
+                    drained = 0
+                    while response is not None:
+                        if response[0] == b"message":
+                            # Fast path: route the raw [type, channel, data] reply
+                            # without redis-py building and inspecting its own dict
+                            channel = response[1]
+                            queues = routes.get(channel)
+                            if queues:
+                                message = {
+                                    "type": "message",
+                                    "channel": channel,
+                                    "data": response[2],
+                                }
+                                for queue in queues:
+                                    await queue.put(message)
+                        else:
+                            # Subscribe/unsubscribe/pong replies only go through
+                            # redis-py for its subscription bookkeeping
+                            await handle_message(response, ignore_subscribe_messages=True)
+
+                        drained += 1
+                        if drained >= DRAIN_BATCH_SIZE:
+                            break
+
+                        response = await parse_response(block=False, timeout=0)
+
+                except Exception as e:
+                    await self._backoff.sleep(e)
+
+        except asyncio.CancelledError:
+            log.info("[ SUBSCRIBER ] Loop cancelled")
+            raise
+
+
+# One hub per Redis client, created on first subscribe
+_hubs: Dict[Any, PubSubHub] = {}
+
+def get_hub(redis_client: Any) -> PubSubHub:
+    """Get (or create) the shared PubSubHub for a Redis client."""
+    hub = _hubs.get(redis_client)
+    if hub is None:
+        hub = _hubs[redis_client] = PubSubHub(redis_client)
+    return hub
+
 
 class RedisSubscriber:
+    """
+    Subscribe to a Redis PubSub channel and hand decoded payloads to handlers.
+
+    The client must be created with decode_responses=False (as core.redis
+    does): message data is passed to the JSON decoder as raw bytes. Pass the
+    dedicated subscriber client from core.redis.init_subscriber_redis, not the
+    shared command client. Subscribers built on the same client share one
+    PubSub connection through its PubSubHub.
+    """
+
     def __init__(
         self,
         redis_client: Any,  
         channel: str,
-        message_handler: Callable[[dict], Awaitable[None]],
+        message_handlers: List[Callable[[dict], Awaitable[None]]],
         shutdown_event: asyncio.Event,
+        workers: int = 4,
+        queue_size: int = 1000,
     ):
+        pool = getattr(redis_client, "connection_pool", None)
+        assert pool is None or not pool.connection_kwargs.get("decode_responses"), \
+            "RedisSubscriber needs a client with decode_responses=False"
+
         self.redis = redis_client
         self.channel = channel
-        self.message_handler = message_handler
+        # Every handler receives the same parsed payload and must not mutate it
+        self.message_handlers = list(message_handlers)
         self.shutdown_event = shutdown_event
 
-        self.pubsub: Optional[Any] = None
+        self.hub: Optional[PubSubHub] = None
         self.task: Optional[asyncio.Task] = None
 
+        # Read loop only enqueues; workers run the (slow) handler
+        self.worker_count = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._workers: List[asyncio.Task] = []
+
     async def start(self):
         """Start Redis PubSub subscriber"""
         try:
-            self.pubsub = self.redis.pubsub()
-            assert self.pubsub is not None
+            await self._subscribe()
 
-            await self.pubsub.subscribe(self.channel)
+            self._workers = [
+                asyncio.create_task(
+                    self._worker(),
+                    name=f"redis_subscriber:{self.channel}:worker-{i}",
+                )
+                for i in range(self.worker_count)
+            ]
 
-            self.task = asyncio.create_task(
-                self._loop(),
-                name=f"redis_subscriber:{self.channel}",
-            )
+            self.task = self._start_loop()
 
-            log.info(f"[ SUBSCRIBER ] Subscribed to channel: {self.channel}")
+            log.info("[ SUBSCRIBER ] Subscribed to channel: %s", self.channel)
 
         except Exception as e:
             log.error("[ SUBSCRIBER ] Failed to start", exc_info=e)
@@ -67,43 +261,252 @@ class RedisSubscriber:
             except asyncio.CancelledError:
                 log.info("[ SUBSCRIBER ] Task cancelled")
 
-        if self.pubsub:
-            await self.pubsub.unsubscribe(self.channel)
-            await self.pubsub.close()
-            log.info("[ SUBSCRIBER ] Unsubscribed and closed")
+        # Stop new messages first so nothing lands behind the sentinels
+        await self._unsubscribe()
+
+        if self._workers:
+            # One sentinel per worker, queued behind the messages already read,
+            # so every worker drains its share and then exits on its own
+            for _ in self._workers:
+                await self._queue.put(None)
+            await self._queue.join()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+
+    async def _subscribe(self):
+        self.hub = get_hub(self.redis)
+        await self.hub.add(self.channel, self._queue)
+
+    async def _unsubscribe(self):
+        if self.hub:
+            await self.hub.remove(self.channel, self._queue)
+            self.hub = None
+
+    def _start_loop(self) -> Optional[asyncio.Task]:
+        # PubSub messages are read by the shared hub loop
+        return None
+
+    async def _worker(self):
+        while True:
+            message = await self._queue.get()
+            try:
+                if message is None:
+                    return
+                await self._handle_message(message)
+            finally:
+                self._queue.task_done()
+
+    async def _handle_message(self, message: RedisMessage) -> bool:
+        """Decode and dispatch a message; False if any handler raised."""
+        try:
+            # orjson accepts bytes and str directly, no decode step needed
+            payload = orjson.loads(message["data"])
+        except orjson.JSONDecodeError:
+            # Retrying cannot fix a malformed payload, treat it as done
+            log.error("[ SUBSCRIBER ] Invalid JSON payload")
+            return True
+
+        # Parsed once, then fanned out to all handlers
+        results = await asyncio.gather(
+            *(handler(payload) for handler in self.message_handlers),
+            return_exceptions=True,
+        )
+        handled = True
+        for result in results:
+            if isinstance(result, Exception):
+                log.error("[ SUBSCRIBER ] Message handler error", exc_info=result)
+                handled = False
+        return handled
+
+
+class RedisStreamSubscriber(RedisSubscriber):
+    """
+    Consume a Redis Stream through a consumer group instead of PubSub.
+
+    Producers XADD the JSON payload under the "data" field. Entries are read
+    in batches with XREADGROUP and acknowledged once every handler succeeded.
+    The consumer name is stable (hostname by default), so on start entries this
+    consumer read but never acknowledged are read again, and entries left idle
+    by consumers that no longer exist are claimed with XAUTOCLAIM. Messages
+    published while the service is down are read once it is back.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        channel: str,
+        message_handlers: List[Callable[[dict], Awaitable[None]]],
+        shutdown_event: asyncio.Event,
+        group: str,
+        consumer: Optional[str] = None,
+        batch_size: int = 100,
+        block_ms: int = 1000,  # keep below the client's socket_timeout
+        claim_idle_ms: int = 60_000,
+        **kwargs: Any,
+    ):
+        super().__init__(
+            redis_client, channel, message_handlers, shutdown_event, **kwargs
+        )
+        self.group = group
+        # Must survive restarts, otherwise our pending entries are orphaned
+        self.consumer = consumer or socket.gethostname()
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self._backoff = _Backoff()
+
+        # Ids of handled entries, acknowledged together with one XACK
+        self._pending_acks: List[bytes] = []
+
+        # Set while a read batch is being queued; stop() must not cancel then
+        self._enqueuing = False
+        self._stopping = False
+
+    async def stop(self):
+        self._stopping = True
+        if self.task and self._enqueuing:
+            # Let the loop queue the batch it already read; it exits right after
+            await self.task
+
+        await super().stop()
+        # Workers are drained by now, ack whatever they finished last
+        await self._flush_acks()
+
+    async def _subscribe(self):
+        try:
+            await self.redis.xgroup_create(self.channel, self.group, id="$", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _unsubscribe(self):
+        log.info("[ SUBSCRIBER ] Stream consumer stopped")
+
+    def _start_loop(self) -> Optional[asyncio.Task]:
+        return asyncio.create_task(
+            self._loop(),
+            name=f"redis_subscriber:{self.channel}",
+        )
 
     async def _loop(self):
-        log.info("[ SUBSCRIBER ] Listening for messages...")
-        assert self.pubsub is not None
+        log.info("[ SUBSCRIBER ] Reading stream entries...")
+
+        xreadgroup = self.redis.xreadgroup
+        is_stopped = self.shutdown_event.is_set
+        streams = {self.channel: ">"}
 
         try:
-            async for message in self.pubsub.listen():
-                if self.shutdown_event.is_set():
-                    break
+            try:
+                await self._recover_pending()
+            except Exception as e:
+                log.error("[ SUBSCRIBER ] Failed to recover pending stream entries", exc_info=e)
 
-                if message is None:
-                    continue
+            while not (self._stopping or is_stopped()):
+                await self._flush_acks()
 
-                if message["type"] != "message":
+                try:
+                    response = await xreadgroup(
+                        self.group,
+                        self.consumer,
+                        streams,
+                        count=self.batch_size,
+                        block=self.block_ms,
+                    )
+                except Exception as e:
+                    await self._backoff.sleep(e)
                     continue
 
-                await self._handle_message(message)
+                self._backoff.reset()
+
+                for _stream, entries in response or ():
+                    await self._enqueue_entries(entries)
 
         except asyncio.CancelledError:
             log.info("[ SUBSCRIBER ] Loop cancelled")
             raise
 
-    async def _handle_message(self, message: RedisMessage):
+    async def _recover_pending(self):
+        """Queue entries that were read before a crash but never acknowledged."""
+        recovered = set()
+
+        # Our own pending entries: "0" re-reads this consumer's history
+        last_id = "0"
+        while not self._stopping:
+            response = await self.redis.xreadgroup(
+                self.group,
+                self.consumer,
+                {self.channel: last_id},
+                count=self.batch_size,
+            )
+            entries = response[0][1] if response else []
+            if not entries:
+                break
+
+            recovered.update(entry_id for entry_id, _fields in entries)
+            await self._enqueue_entries(entries)
+            last_id = entries[-1][0]
+
+        # Entries stuck with consumers that are gone (e.g. a renamed host)
+        start_id = "0-0"
+        while not self._stopping:
+            next_id, entries, *_ = await self.redis.xautoclaim(
+                self.channel,
+                self.group,
+                self.consumer,
+                min_idle_time=self.claim_idle_ms,
+                start_id=start_id,
+                count=self.batch_size,
+            )
+            await self._enqueue_entries(
+                [entry for entry in entries if entry[0] not in recovered]
+            )
+            if next_id in (b"0-0", "0-0"):
+                break
+            start_id = next_id
+
+        if recovered:
+            log.info("[ SUBSCRIBER ] Re-queued %d pending stream entries", len(recovered))
+
+    async def _enqueue_entries(self, entries):
+        enqueue = self._queue.put
+        channel = self.channel
+
+        self._enqueuing = True
         try:
-            raw_data = message["data"]
+            for entry_id, fields in entries:
+                if not fields:
+                    # Deleted from the stream while pending, nothing to handle
+                    self._pending_acks.append(entry_id)
+                    continue
 
-            if isinstance(raw_data, bytes):
-                raw_data = raw_data.decode("utf-8")
+                await enqueue({
+                    "type": "message",
+                    "channel": channel,
+                    "data": fields.get(b"data", b""),
+                    "id": entry_id,
+                })
+        finally:
+            self._enqueuing = False
 
-            payload = json.loads(raw_data)
-            await self.message_handler(payload)
+    async def _handle_message(self, message: RedisMessage) -> bool:
+        handled = await super()._handle_message(message)
+        # A failed handler leaves the entry pending, so it is retried on restart
+        if handled:
+            self._pending_acks.append(message["id"])
+        return handled
 
-        except json.JSONDecodeError:
-            log.error("[ SUBSCRIBER ] Invalid JSON payload")
+    async def _flush_acks(self):
+        """Acknowledge all handled entries in a single round-trip."""
+        if not self._pending_acks:
+            return
+
+        ids, self._pending_acks = self._pending_acks, []
+        try:
+            await self.redis.xack(self.channel, self.group, *ids)
+        except asyncio.CancelledError:
+            self._pending_acks[:0] = ids
+            raise
         except Exception as e:
-            log.error("[ SUBSCRIBER ] Message handler error", exc_info=e)
+            # Keep them for the next flush; unacked entries stay pending anyway
+            self._pending_acks[:0] = ids
+            log.error("[ SUBSCRIBER ] Failed to ack stream entries", exc_info=e)
@@ -4,15 +4,16 @@ import asyncio
 import logging
 from pathlib import Path
 
+try:
+    import uvloop
+except ImportError:  # uvloop is optional (not available on Windows)
+    uvloop = None
+
 from core import db
 from config.logger import setup_logging
-from services.emailer import BatchEmailProcessor, EmailSender
+from services.emailer import BatchEmailProcessor, EmailSender, close_smtp_sessions
 from services.email_stats import EmailLogStats
 
-# Setup logging
-
-setup_logging()
-
 log = logging.getLogger(__name__)
 
 
@@ -24,15 +25,13 @@ async def close_test_db():
     """Close database pool after testing."""
     await db.close_pool()
 
-async def test_single_account(email_data):
+async def test_single_account(sender: EmailSender, email_data):
     """Test sending email for single account."""
     
     log.info("\n" + "="*60)
     log.info("TEST 1: Single Account Email Test")
     log.info("="*60)
     
-    sender = EmailSender(EmailLogStats)
-    
     # Test with account ID 1
     account_id = 1
     log.info(f"[ TEST ] Testing single account (ID: {account_id})")
@@ -52,14 +51,42 @@ async def test_single_account(email_data):
         return False
 
 
-async def test_batch_processing(email_data):
+async def test_multiple_accounts(sender: EmailSender, email_data, account_ids, concurrency=32):
+    """Test sending email for several accounts concurrently."""
+    
+    log.info("\n" + "="*60)
+    log.info("TEST 1b: Multiple Accounts Email Test")
+    log.info("="*60)
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def send(account_id):
+        async with semaphore:
+            try:
+                return await sender.send_email_for_account(account_id, email_data)
+            except Exception as e:
+                log.error(f"[ TEST ] ❌ Error testing account {account_id}: {e}", exc_info=True)
+                return False
+    
+    log.info(f"[ TEST ] Testing accounts {account_ids} (concurrency: {concurrency})")
+    
+    results = await asyncio.gather(*(send(account_id) for account_id in account_ids))
+    
+    for account_id, result in zip(account_ids, results):
+        if result:
+            log.info(f"[ TEST ] ✅ Email sent successfully for account {account_id}")
+        else:
+            log.warning(f"[ TEST ] ⚠️ Email not sent for account {account_id} (may be filtered)")
+    
+    return dict(zip(account_ids, results))
+
+
+async def test_batch_processing(processor: BatchEmailProcessor, email_data):
     """Test batch processing for all active accounts."""
     log.info("\n" + "="*60)
     log.info("TEST 2: Batch Processing Test")
     log.info("="*60)
     
-    processor = BatchEmailProcessor(EmailLogStats)
-    
     log.info(f"[ TEST ] Testing batch processing for all active accounts")
     
     try:
@@ -86,6 +113,11 @@ async def test_batch_processing(email_data):
 
 async def run_all_tests():
     """Run all tests."""
+    # One processor (and its sender) for every test, so SMTP sessions and
+    # template caches are reused the way the service reuses them
+    processor = BatchEmailProcessor(EmailLogStats())
+    sender = processor.sender
+    
     try:
     
         email_data = {
@@ -100,8 +132,9 @@ async def run_all_tests():
         await init_test_db()
         
         # Uncomment to test actual email sending:
-        await test_single_account(email_data)
-        # await test_batch_processing(email_data)
+        # await test_single_account(sender, email_data)
+        await test_multiple_accounts(sender, email_data, account_ids=[1])
+        # await test_batch_processing(processor, email_data)
         
         log.info("\n" + "="*60)
         log.info("ALL TESTS COMPLETED")
@@ -111,12 +144,15 @@ async def run_all_tests():
         log.error(f"[ TEST ] ❌ Fatal error in tests: {e}", exc_info=True)
     
     finally:
-        # Close DB
+        # Quit pooled SMTP sessions, then close DB
+        await close_smtp_sessions()
         await close_test_db()
 
 
 async def main():
     """Main test runner."""
+    setup_logging()
+    
     log.info("="*60)
     log.info("AUTO EMAILER - DUMMY TESTER")
     log.info("="*60)
@@ -125,4 +161,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file